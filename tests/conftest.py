@@ -0,0 +1,16 @@
+import csv
+
+import pytest
+
+from wootools.woocommerce_export import WoocommerceExport
+
+
+@pytest.fixture
+def write_export():
+    def write(path, rows):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([WoocommerceExport.ID, WoocommerceExport.CATEGORIES])
+            writer.writerows(rows)
+
+    return write
@@ -0,0 +1,120 @@
+import io
+
+import pytest
+
+import wootools
+from wootools.exceptions import InvalidCloudCommerceExport
+from wootools.fix_categories import FixCategories
+from wootools.set_shipping_classes import (
+    InternationalShipping,
+    PackageTypes,
+    SetShippingClasses,
+    ShippingClasses,
+)
+from wootools.woocommerce_export import WoocommerceExport
+
+HEADER = [WoocommerceExport.ID, WoocommerceExport.CATEGORIES]
+ROWS = [["1", ""], ["2", "Clothes"], ["3", f"Clothes, {FixCategories.UNCATEGORIZED}"]]
+EXPECTED = [["1", FixCategories.UNCATEGORIZED], ["3", "Clothes"]]
+
+
+def test_run_from_rows():
+    rows, stats = wootools.run(FixCategories, [HEADER] + ROWS)
+    assert stats.complete is False
+    assert list(rows) == EXPECTED
+    assert stats.header == FixCategories.IMPORT_HEADER
+    assert stats.export_rows == 3
+    assert stats.update_rows == 2
+    assert stats.complete is True
+
+
+def test_run_from_mappings():
+    rows, stats = wootools.run(FixCategories, [dict(zip(HEADER, _)) for _ in ROWS])
+    assert list(rows) == EXPECTED
+
+
+def test_run_from_file_object():
+    f = io.StringIO("\r\n".join(",".join(f'"{v}"' for v in _) for _ in [HEADER] + ROWS))
+    rows, stats = wootools.run(FixCategories, f)
+    assert list(rows) == EXPECTED
+
+
+def test_run_from_shared_export():
+    export = WoocommerceExport(rows=[HEADER] + ROWS)
+    first, _ = wootools.run(FixCategories, export)
+    second, _ = wootools.run(FixCategories, export)
+    assert list(first) == list(second) == EXPECTED
+
+
+def test_run_with_lookup():
+    sku = "14M-RF0-DW3"
+    lookup = {
+        sku: {
+            SetShippingClasses.CC_SKU_COLUMN: sku,
+            SetShippingClasses.CC_PACKAGE_TYPE_COLUMN: PackageTypes.COURIER,
+            SetShippingClasses.CC_INTERNATIONAL_SHIPPING_COLUMN: InternationalShipping.EXPRESS,
+        }
+    }
+    row = {
+        WoocommerceExport.ID: "1",
+        WoocommerceExport.SKU: sku,
+        WoocommerceExport.SHIPPING_CLASS: ShippingClasses.STANDARD,
+        WoocommerceExport.CATEGORIES: "Sports",
+    }
+    rows, stats = wootools.run(SetShippingClasses, [row], lookup=lookup)
+    assert list(rows) == [["1", ShippingClasses.HEAVY]]
+
+
+def test_run_requires_cloud_commerce_export():
+    with pytest.raises(ValueError):
+        wootools.run(SetShippingClasses, [])
+
+
+def test_run_validates_exports_up_front():
+    lookup = {
+        "NO-SHIPPING": {
+            SetShippingClasses.CC_SKU_COLUMN: "NO-SHIPPING",
+            SetShippingClasses.CC_PACKAGE_TYPE_COLUMN: PackageTypes.PACKET,
+            SetShippingClasses.CC_INTERNATIONAL_SHIPPING_COLUMN: "",
+        }
+    }
+    rows = iter(
+        [
+            {WoocommerceExport.ID: "1", WoocommerceExport.SKU: "MISSING"},
+            {WoocommerceExport.ID: "2", WoocommerceExport.SKU: "NO-SHIPPING"},
+            {WoocommerceExport.ID: "3", WoocommerceExport.SKU: ""},
+        ]
+    )
+    with pytest.raises(InvalidCloudCommerceExport) as e:
+        wootools.run(SetShippingClasses, rows, lookup=lookup)
+    assert e.value.report.missing_skus == {"MISSING"}
+    assert e.value.report.missing_international_shipping == {"NO-SHIPPING"}
+
+
+def test_run_skips_invalid_rows():
+    row = {WoocommerceExport.ID: "1", WoocommerceExport.SKU: "MISSING"}
+    rows, stats = wootools.run(
+        SetShippingClasses, iter([row]), lookup={}, skip_invalid=True
+    )
+    assert list(rows) == []
+    assert stats.complete is True
+    assert stats.validation_report.missing_skus == {"MISSING"}
+
+
+def test_run_counts_skipped_rows():
+    rows = [
+        {WoocommerceExport.ID: "1", WoocommerceExport.SKU: "MISSING"},
+        {WoocommerceExport.ID: "2", WoocommerceExport.SKU: ""},
+    ]
+    rows, stats = wootools.run(SetShippingClasses, rows, lookup={}, skip_invalid=True)
+    list(rows)
+    assert stats.export_rows == 1
+    assert stats.skipped_rows == 1
+
+
+@pytest.mark.parametrize("source", [[], io.StringIO(""), WoocommerceExport(rows=[])])
+def test_run_with_empty_source(source):
+    rows, stats = wootools.run(FixCategories, source)
+    assert list(rows) == []
+    assert stats.export_rows == 0
+    assert stats.complete is True
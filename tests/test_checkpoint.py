@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+from wootools.checkpoint import CheckpointedUpdate
+from wootools.exceptions import CheckpointMismatch
+from wootools.fix_categories import FixCategories
+from wootools.woocommerce_export import WoocommerceExport
+
+HEADER = [WoocommerceExport.ID, WoocommerceExport.CATEGORIES]
+ROWS = [[str(i), "" if i % 2 else "Clothes"] for i in range(10)]
+
+
+def create_update(checkpoint_dir, chunk_size=3):
+    export = WoocommerceExport(rows=[HEADER] + ROWS)
+    return CheckpointedUpdate(FixCategories, export, checkpoint_dir, chunk_size)
+
+
+def test_chunked_output_matches_update(tmp_path):
+    update = create_update(tmp_path)
+    update.run()
+    assert update.chunk_count == 4
+    export = WoocommerceExport(rows=[HEADER] + ROWS)
+    expected = list(FixCategories.iter_import_data(export))
+    assert list(update.iter_import_data()) == expected
+    output = io.StringIO()
+    assert update.write_output(output) == len(expected)
+
+
+def test_resume_skips_completed_chunks(tmp_path):
+    update = create_update(tmp_path)
+    update.run()
+    update.chunk_path(0).write_text("completed\r\n")
+    update.chunk_path(3).unlink()
+    update = create_update(tmp_path)
+    update.run(resume=True)
+    rows = list(update.iter_import_data())
+    assert rows[0] == ["completed"]
+    assert rows[-1] == ["9", FixCategories.UNCATEGORIZED]
+
+
+def test_run_without_resume_clears_checkpoint(tmp_path):
+    update = create_update(tmp_path)
+    update.run()
+    update.chunk_path(0).write_text("completed\r\n")
+    update.run()
+    assert list(update.iter_import_data())[0] == ["1", FixCategories.UNCATEGORIZED]
+
+
+def test_resume_with_different_chunk_size(tmp_path):
+    create_update(tmp_path).run()
+    with pytest.raises(CheckpointMismatch):
+        create_update(tmp_path, chunk_size=4).run(resume=True)
+
+
+def test_failed_chunk_leaves_no_files(tmp_path):
+    def import_data():
+        yield ["1", FixCategories.UNCATEGORIZED]
+        raise ValueError
+
+    path = tmp_path / "chunk_000000.csv"
+    with pytest.raises(ValueError):
+        CheckpointedUpdate.write_chunk(path, import_data())
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,358 @@
+"""
+Differential tests for the alternative ways of running product updates.
+
+Randomised exports are generated from fixed seeds and every engine must produce an
+import CSV byte-identical to calling process_export_row on each row, skipping rows
+for which it raises because of missing Cloud Commerce data. Failures are shrunk to
+the smallest set of export rows which still produce a mismatch.
+"""
+
+import csv
+import io
+import itertools
+import random
+
+import pytest
+
+import wootools
+from wootools import workers
+from wootools.add_disclaimers import AddDisclaimers
+from wootools.checkpoint import CheckpointedUpdate
+from wootools.exceptions import CloudCommerceExportError
+from wootools.fan_out import run_sites
+from wootools.fix_categories import FixCategories
+from wootools.product_update import ProductUpdateWithCloudCommerceExport
+from wootools.round_prices import RoundPrices
+from wootools.set_shipping_classes import (
+    Categories,
+    PackageTypes,
+    SetShippingClasses,
+    ShippingClasses,
+)
+from wootools.woocommerce_export import WoocommerceExport
+
+SEEDS = range(5)
+ROW_COUNT = 40
+CC_HEADER = [
+    SetShippingClasses.CC_SKU_COLUMN,
+    SetShippingClasses.CC_RANGE_SKU_COLUMN,
+    SetShippingClasses.CC_PACKAGE_TYPE_COLUMN,
+    SetShippingClasses.CC_INTERNATIONAL_SHIPPING_COLUMN,
+]
+CATEGORIES = [
+    "Clothes",
+    "Home",
+    "Knives",
+    "Sports",
+    Categories.KNIVES,
+    FixCategories.UNCATEGORIZED,
+    "Garden > Tools",
+]
+TEXT = ["", "plain", "two words", 'a "quote"', "comma, separated", "line\nbreak", "é✓"]
+
+
+class Case:
+    """A generated Woocommerce export and, if required, Cloud Commerce export."""
+
+    def __init__(self, update_class, header, rows, cc_rows=None):
+        self.update_class = update_class
+        self.header = header
+        self.rows = rows
+        self.cc_rows = cc_rows
+
+    def with_rows(self, rows):
+        return Case(self.update_class, self.header, rows, self.cc_rows)
+
+    @property
+    def lookup(self):
+        lookup = {}
+        for row in self.cc_rows:
+            row = dict(zip(CC_HEADER, row))
+            lookup[row[SetShippingClasses.CC_SKU_COLUMN]] = row
+            lookup[row[SetShippingClasses.CC_RANGE_SKU_COLUMN]] = row
+        return lookup
+
+    @property
+    def args(self):
+        if self.cc_rows is None:
+            return ()
+        return (self.lookup,)
+
+    def update_kwargs(self, cc_path):
+        if cc_path is None:
+            return {}
+        lookup = self.update_class.create_lookup(cc_path)
+        return {"lookup": lookup, "skip_invalid": True}
+
+    def write(self, directory, name="export.csv"):
+        directory.mkdir(parents=True, exist_ok=True)
+        export_path = directory / name
+        write_csv(export_path, self.header, self.rows)
+        cc_path = None
+        if self.cc_rows is not None:
+            cc_path = directory / "cc_export.csv"
+            write_csv(cc_path, CC_HEADER, self.cc_rows)
+        return export_path, cc_path
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def import_csv(header, import_rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(import_rows)
+    return output.getvalue()
+
+
+def random_text(rng):
+    return rng.choice(TEXT)
+
+
+def random_categories(rng):
+    categories = rng.sample(CATEGORIES, rng.randint(0, 3))
+    return rng.choice([", ", ","]).join(categories)
+
+
+def random_price(rng):
+    return rng.choice(
+        [
+            "",
+            "abc",
+            "0",
+            "0.00",
+            "-1.50",
+            str(rng.randint(0, 200)),
+            f"{rng.uniform(0, 200):.2f}",
+            f"{rng.uniform(0, 200):.3f}",
+            f"{rng.uniform(0, 2):.1f}",
+        ]
+    )
+
+
+def random_description(rng):
+    description = random_text(rng)
+    if rng.random() < 0.2:
+        description += AddDisclaimers.disclaimer
+    return description
+
+
+def random_sku(rng):
+    return "-".join(
+        "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789") for _ in range(3))
+        for _ in range(3)
+    )
+
+
+def generate_cc_rows(rng):
+    cc_rows = []
+    for _ in range(10):
+        cc_rows.append(
+            [
+                random_sku(rng),
+                f"RNG_{random_sku(rng)}",
+                rng.choice(PackageTypes.ALL + [""]),
+                rng.choice(["Standard", "Express", "No International Shipping", ""]),
+            ]
+        )
+    return cc_rows
+
+
+def generate_case(update_class, seed, cc_rows=None):
+    rng = random.Random(f"{update_class.__name__}-{seed}")
+    header = [
+        WoocommerceExport.ID,
+        WoocommerceExport.SKU,
+        "Name",
+        WoocommerceExport.CATEGORIES,
+        WoocommerceExport.SHIPPING_CLASS,
+        WoocommerceExport.PRICE,
+        WoocommerceExport.DESCRIPTION,
+    ]
+    rng.shuffle(header)
+    woo_skus = ["", random_sku(rng), f"RNG_{random_sku(rng)}_1"]
+    if not issubclass(update_class, ProductUpdateWithCloudCommerceExport):
+        cc_rows = None
+    else:
+        if cc_rows is None:
+            cc_rows = generate_cc_rows(rng)
+        for sku, range_sku, *_ in cc_rows:
+            woo_skus.extend([sku, f"{sku}_{rng.randint(1, 9)}", f"{range_sku}_1"])
+    rows = []
+    for product_id in range(1, ROW_COUNT + 1):
+        values = {
+            WoocommerceExport.ID: str(product_id),
+            WoocommerceExport.SKU: rng.choice(woo_skus),
+            "Name": random_text(rng),
+            WoocommerceExport.CATEGORIES: random_categories(rng),
+            WoocommerceExport.SHIPPING_CLASS: rng.choice(
+                ShippingClasses.ALL + [Categories.KNIFE]
+            ),
+            WoocommerceExport.PRICE: random_price(rng),
+            WoocommerceExport.DESCRIPTION: random_description(rng),
+        }
+        rows.append([values[column] for column in header])
+    return Case(update_class, header, rows, cc_rows)
+
+
+def reference_engine(case, tmp_path):
+    import_rows = []
+    for values in case.rows:
+        row = dict(zip(case.header, values))
+        try:
+            import_row = case.update_class.process_export_row(row, *case.args)
+        except CloudCommerceExportError:
+            continue
+        if import_row is not None:
+            import_rows.append(import_row)
+    if not import_rows:
+        return None
+    return import_csv(case.update_class.IMPORT_HEADER, import_rows).encode("utf-8")
+
+
+def product_update_engine(case, tmp_path):
+    export_path, cc_path = case.write(tmp_path)
+    update = case.update_class(export_path, **case.update_kwargs(cc_path))
+    if not update.import_data:
+        return None
+    output = io.StringIO()
+    update.write_output(output)
+    return output.getvalue().encode("utf-8")
+
+
+def api_engine(case, tmp_path):
+    export_path, cc_path = case.write(tmp_path)
+    with open(export_path, newline="", encoding="utf-8-sig") as f:
+        rows, stats = wootools.run(
+            case.update_class, f, cc_export_path=cc_path, skip_invalid=True
+        )
+        import_rows = list(rows)
+    if not import_rows:
+        return None
+    return import_csv(stats.header, import_rows).encode("utf-8")
+
+
+def checkpoint_engine(case, tmp_path):
+    export_path, cc_path = case.write(tmp_path)
+    export = WoocommerceExport(export_path)
+    args = ()
+    if cc_path is not None:
+        lookup = case.update_class.create_lookup(cc_path)
+        export, report = case.update_class.get_valid_rows(
+            export, lookup, skip_invalid=True
+        )
+        args = (lookup,)
+    update = CheckpointedUpdate(
+        case.update_class,
+        export,
+        tmp_path / "checkpoint",
+        chunk_size=7,
+        args=args,
+    )
+    update.run()
+    if not update.has_import_data():
+        return None
+    output = io.StringIO()
+    update.write_output(output)
+    return output.getvalue().encode("utf-8")
+
+
+def worker_engine(case, tmp_path):
+    export_path, cc_path = case.write(tmp_path)
+    update_kwargs = case.update_kwargs(cc_path)
+    with workers.create_pool(case.update_class, update_kwargs, workers=1) as pool:
+        (result,) = workers.process_export_files(pool, [export_path], tmp_path)
+    assert result.error is None, result.error
+    if result.output_path is None:
+        return None
+    return result.output_path.read_bytes()
+
+
+UPDATE_CLASSES = [RoundPrices, FixCategories, AddDisclaimers, SetShippingClasses]
+ENGINES = [product_update_engine, api_engine, checkpoint_engine, worker_engine]
+
+
+def shrink(rows, fails):
+    """Return a minimal subset of rows for which fails is still True."""
+    chunks = 2
+    while len(rows) > 1:
+        size = -(-len(rows) // chunks)
+        for start in range(0, len(rows), size):
+            candidate = rows[:start] + rows[start + size :]
+            if candidate and fails(candidate):
+                rows = candidate
+                chunks = max(chunks - 1, 2)
+                break
+        else:
+            if chunks >= len(rows):
+                break
+            chunks = min(chunks * 2, len(rows))
+    return rows
+
+
+def assert_equivalent(case, engine, tmp_path):
+    runs = itertools.count()
+
+    def run(rows):
+        run_path = tmp_path / str(next(runs))
+        run_path.mkdir()
+        case_rows = case.with_rows(rows)
+        return reference_engine(case_rows, run_path), engine(case_rows, run_path)
+
+    def fails(rows):
+        expected, actual = run(rows)
+        return expected != actual
+
+    if not fails(case.rows):
+        return
+    rows = shrink(case.rows, fails)
+    expected, actual = run(rows)
+    pytest.fail(
+        f"{engine.__name__} differs from process_export_row for "
+        f"{case.update_class.__name__}.\n"
+        f"Minimal rows: {[dict(zip(case.header, row)) for row in rows]}\n"
+        f"Expected: {expected!r}\nActual: {actual!r}"
+    )
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("engine", ENGINES, ids=lambda engine: engine.__name__)
+@pytest.mark.parametrize(
+    "update_class", UPDATE_CLASSES, ids=lambda update_class: update_class.__name__
+)
+def test_engine_matches_reference(update_class, engine, seed, tmp_path):
+    assert_equivalent(generate_case(update_class, seed), engine, tmp_path)
+
+
+@pytest.mark.parametrize(
+    "update_class", UPDATE_CLASSES, ids=lambda update_class: update_class.__name__
+)
+def test_fan_out_matches_reference(update_class, tmp_path):
+    # Every site shares one Cloud Commerce export.
+    cc_rows = generate_cc_rows(random.Random(update_class.__name__))
+    cases = [generate_case(update_class, seed, cc_rows) for seed in SEEDS]
+    paths = [
+        case.write(tmp_path / "exports", f"site_{seed}.csv")
+        for seed, case in zip(SEEDS, cases)
+    ]
+    export_paths = [export_path for export_path, cc_path in paths]
+    update_kwargs = cases[0].update_kwargs(paths[0][1])
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    results = run_sites(
+        update_class, export_paths, output_dir, update_kwargs, workers=2
+    )
+    for case, result in zip(cases, results):
+        assert result.error is None
+        actual = None if result.output_path is None else result.output_path.read_bytes()
+        assert actual == reference_engine(case, tmp_path), result.export_path.name
+
+
+def test_shrink_finds_minimal_rows():
+    rows = list(range(50))
+    assert shrink(rows, lambda rows: 17 in rows and 33 in rows) == [17, 33]
@@ -0,0 +1,67 @@
+import pytest
+from click.testing import CliRunner
+
+from wootools.cli import cli
+from wootools.fan_out import find_duplicate_outputs, find_exports, run_sites
+from wootools.fix_categories import FixCategories
+from wootools.workers import write_update_file
+
+
+def test_find_exports(tmp_path):
+    for name in ("site_a.csv", "site_b.csv", "other.txt"):
+        (tmp_path / name).touch()
+    paths = find_exports([tmp_path / "site_b.csv"], [str(tmp_path / "site_*.csv")])
+    assert paths == [tmp_path / "site_b.csv", tmp_path / "site_a.csv"]
+
+
+def test_find_duplicate_outputs(tmp_path):
+    paths = [tmp_path / "a" / "export.csv", tmp_path / "b" / "export.csv"]
+    assert find_duplicate_outputs(paths, tmp_path) == paths
+    assert find_duplicate_outputs(paths[:1], tmp_path) == []
+
+
+def test_run_sites(tmp_path, write_export):
+    write_export(tmp_path / "site_a.csv", [["1", ""]])
+    write_export(tmp_path / "site_b.csv", [["2", "Clothes"]])
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    results = run_sites(
+        FixCategories, [tmp_path / "site_a.csv", tmp_path / "site_b.csv"], output_dir
+    )
+    assert [result.row_count for result in results] == [1, 0]
+    assert results[0].output_path == output_dir / "site_a_import.csv"
+    assert results[1].output_path is None
+    assert [path.name for path in output_dir.iterdir()] == ["site_a_import.csv"]
+
+
+def test_set_shipping_classes_sites_exits_with_error_for_failed_site(tmp_path):
+    (tmp_path / "site.csv").write_text("ID,SKU,Categories,Shipping class\n1,ABC,,\n")
+    (tmp_path / "cc.csv").write_text(
+        "VAR_SKU,RNG_SKU,OPT_Package Type,OPT_International Shipping\n"
+        "XYZ,RNG_XYZ,Packet,Standard\n"
+    )
+    result = CliRunner().invoke(
+        cli,
+        [
+            "set-shipping-classes-sites",
+            "-w",
+            str(tmp_path / "site.csv"),
+            "-i",
+            str(tmp_path / "cc.csv"),
+            "-o",
+            str(tmp_path),
+        ],
+    )
+    assert result.exit_code == 1
+    assert "1 exports processed: 0 update rows, 1 failed." in result.output
+
+
+def test_failed_update_file_leaves_no_files(tmp_path):
+    class FailingUpdate:
+        def write_output(self, f):
+            f.write("ID\r\n")
+            raise ValueError
+
+    with pytest.raises(ValueError):
+        write_update_file(FailingUpdate(), tmp_path / "site_import.csv")
+    assert list(tmp_path.iterdir()) == []
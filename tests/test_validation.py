@@ -0,0 +1,119 @@
+import pickle
+
+import pytest
+from click.testing import CliRunner
+
+from wootools.cli import cli
+from wootools.exceptions import InvalidCloudCommerceExport, PackageTypeNotSet
+from wootools.set_shipping_classes import (
+    InternationalShipping,
+    PackageTypes,
+    SetShippingClasses,
+    ShippingClasses,
+)
+from wootools.woocommerce_export import WoocommerceExport
+
+
+def cc_row(sku, package_type, international_shipping):
+    return {
+        SetShippingClasses.CC_SKU_COLUMN: sku,
+        SetShippingClasses.CC_PACKAGE_TYPE_COLUMN: package_type,
+        SetShippingClasses.CC_INTERNATIONAL_SHIPPING_COLUMN: international_shipping,
+    }
+
+
+def woo_row(pid, sku):
+    return {
+        WoocommerceExport.ID: pid,
+        WoocommerceExport.SKU: sku,
+        WoocommerceExport.SHIPPING_CLASS: ShippingClasses.STANDARD,
+        WoocommerceExport.CATEGORIES: "Sports",
+    }
+
+
+LOOKUP = {
+    "VALID": cc_row("VALID", PackageTypes.COURIER, InternationalShipping.EXPRESS),
+    "NO-PACKAGE": cc_row("NO-PACKAGE", "", InternationalShipping.EXPRESS),
+    "NO-SHIPPING": cc_row("NO-SHIPPING", PackageTypes.PACKET, ""),
+    "NEITHER": cc_row("NEITHER", "", ""),
+}
+EXPORT = [
+    woo_row("1", "VALID"),
+    woo_row("2", "NO-PACKAGE"),
+    woo_row("3", "NO-SHIPPING"),
+    woo_row("4", "NEITHER"),
+    woo_row("5", "MISSING"),
+    woo_row("6", "MISSING_2"),
+    woo_row("7", ""),
+]
+
+
+def test_validation_report_collects_every_problem():
+    report = SetShippingClasses.validate_exports(EXPORT, LOOKUP)
+    assert not report.is_valid
+    assert report.missing_skus == {"MISSING"}
+    assert report.missing_package_types == {"NO-PACKAGE", "NEITHER"}
+    assert report.missing_international_shipping == {"NO-SHIPPING", "NEITHER"}
+    assert report.invalid_skus == {
+        "NO-PACKAGE",
+        "NO-SHIPPING",
+        "NEITHER",
+        "MISSING",
+        "MISSING_2",
+    }
+    assert len(report.lines()) == 4
+
+
+def test_valid_export():
+    report = SetShippingClasses.validate_exports(EXPORT[:1], LOOKUP)
+    assert report.is_valid
+    assert report.lines() == []
+
+
+def test_get_valid_rows_raises_for_invalid_rows():
+    with pytest.raises(InvalidCloudCommerceExport) as e:
+        SetShippingClasses.get_valid_rows(EXPORT, LOOKUP)
+    assert e.value.report.missing_skus == {"MISSING"}
+
+
+def test_get_valid_rows_skips_invalid_rows():
+    rows, report = SetShippingClasses.get_valid_rows(EXPORT, LOOKUP, skip_invalid=True)
+    assert [row[WoocommerceExport.ID] for row in rows] == ["1", "7"]
+
+
+def test_package_type_not_set():
+    with pytest.raises(PackageTypeNotSet):
+        SetShippingClasses.get_package_type(LOOKUP["NO-PACKAGE"])
+
+
+def test_exceptions_can_be_pickled():
+    report = SetShippingClasses.validate_exports(EXPORT, LOOKUP)
+    error = pickle.loads(pickle.dumps(InvalidCloudCommerceExport(report)))
+    assert error.report.missing_skus == {"MISSING"}
+    assert str(error) == str(InvalidCloudCommerceExport(report))
+
+
+def write_exports(tmp_path):
+    (tmp_path / "woo.csv").write_text(
+        "ID,SKU,Categories,Shipping class\n1,ABC,,\n2,XYZ,,\n"
+    )
+    (tmp_path / "cc.csv").write_text(
+        "VAR_SKU,RNG_SKU,OPT_Package Type,OPT_International Shipping\n"
+        "XYZ,RNG_XYZ,Courier,Standard\n"
+    )
+    return ["-w", str(tmp_path / "woo.csv"), "-i", str(tmp_path / "cc.csv")]
+
+
+def test_set_shipping_classes_exits_with_error_for_invalid_exports(tmp_path):
+    args = ["set-shipping-classes"] + write_exports(tmp_path)
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 1
+    assert result.stdout == ""
+    assert "1 products not found in the Cloud Commerce Export: ABC" in result.stderr
+
+
+def test_set_shipping_classes_skips_invalid_rows(tmp_path):
+    args = ["set-shipping-classes", "--skip_invalid"] + write_exports(tmp_path)
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == ["ID,Shipping class", "2,Heavy"]
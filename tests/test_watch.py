@@ -0,0 +1,93 @@
+import csv
+import os
+
+from wootools.fix_categories import FixCategories
+from wootools.watch import ExportWatcher
+
+
+def create_dirs(tmp_path):
+    watch_dir = tmp_path / "watch"
+    output_dir = tmp_path / "output"
+    watch_dir.mkdir()
+    output_dir.mkdir()
+    return watch_dir, output_dir
+
+
+def test_export_is_processed_once_stable(tmp_path, write_export):
+    watch_dir, output_dir = create_dirs(tmp_path)
+    write_export(watch_dir / "export.csv", [["1", ""], ["2", "Clothes"]])
+    with ExportWatcher(FixCategories, watch_dir, output_dir, workers=1) as watcher:
+        assert watcher.run_once() == []
+        assert watcher.run_once() == [watch_dir / "export.csv"]
+        assert watcher.run_once() == []
+    with open(output_dir / "export_import.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [FixCategories.IMPORT_HEADER, ["1", FixCategories.UNCATEGORIZED]]
+    assert not (watch_dir / "export.csv").exists()
+    assert (watch_dir / ExportWatcher.PROCESSED_DIR / "export.csv").exists()
+
+
+def test_export_without_updates_writes_no_file(tmp_path, write_export):
+    watch_dir, output_dir = create_dirs(tmp_path)
+    write_export(watch_dir / "export.csv", [["1", "Clothes"]])
+    with ExportWatcher(FixCategories, watch_dir, output_dir, workers=1) as watcher:
+        watcher.run_once()
+        watcher.run_once()
+    assert list(output_dir.iterdir()) == []
+
+
+def test_failed_export_is_moved_to_failed(tmp_path):
+    watch_dir, output_dir = create_dirs(tmp_path)
+    (watch_dir / "export.csv").write_text("ID\n1\n")
+    with ExportWatcher(FixCategories, watch_dir, output_dir, workers=1) as watcher:
+        watcher.run_once()
+        watcher.run_once()
+    assert (watch_dir / ExportWatcher.FAILED_DIR / "export.csv").exists()
+
+
+def test_restarted_watcher_does_not_reprocess_exports(tmp_path, write_export):
+    watch_dir, output_dir = create_dirs(tmp_path)
+    write_export(watch_dir / "export.csv", [["1", ""]])
+    with ExportWatcher(FixCategories, watch_dir, output_dir, workers=1) as watcher:
+        watcher.run_once()
+        watcher.run_once()
+    (output_dir / "export_import.csv").unlink()
+    with ExportWatcher(FixCategories, watch_dir, output_dir, workers=1) as watcher:
+        assert watcher.run_once() == []
+        assert watcher.run_once() == []
+    assert list(output_dir.iterdir()) == []
+
+
+def test_export_removed_before_it_is_ready(tmp_path, write_export):
+    watch_dir, output_dir = create_dirs(tmp_path)
+    write_export(watch_dir / "export.csv", [["1", ""]])
+    with ExportWatcher(FixCategories, watch_dir, output_dir, workers=1) as watcher:
+        watcher.run_once()
+        (watch_dir / "export.csv").unlink()
+        assert watcher.run_once() == []
+        assert watcher._pending == {}
+
+
+class CrashingUpdate(FixCategories):
+    def __init__(self, export_file_path):
+        if os.path.basename(export_file_path) == "crash.csv":
+            os._exit(1)
+        super().__init__(export_file_path)
+
+
+def test_worker_crash_does_not_stop_watcher(tmp_path, write_export):
+    watch_dir, output_dir = create_dirs(tmp_path)
+    write_export(watch_dir / "crash.csv", [["1", ""]])
+    write_export(watch_dir / "export.csv", [["1", ""]])
+    with ExportWatcher(CrashingUpdate, watch_dir, output_dir, workers=1) as watcher:
+        watcher.run_once()
+        watcher.run_once()
+        assert (watch_dir / ExportWatcher.FAILED_DIR / "crash.csv").exists()
+        assert (watch_dir / ExportWatcher.PROCESSED_DIR / "export.csv").exists()
+        write_export(watch_dir / "next.csv", [["1", ""]])
+        watcher.run_once()
+        watcher.run_once()
+    assert sorted(path.name for path in output_dir.iterdir()) == [
+        "export_import.csv",
+        "next_import.csv",
+    ]
@@ -1,2 +1,3 @@
 """Wootools provides tools for working with Woocommerce."""
+from .api import UpdateStats, run  # NOQA
 from .cli import fix_categories  # NOQA
@@ -0,0 +1,115 @@
+"""
+Run product updates in process.
+
+run returns the import rows for an update as a lazy iterator rather than writing
+them to stdout, so updates can be used without the CLI.
+"""
+
+import itertools
+import os
+from collections.abc import Mapping
+
+from .product_update import ProductUpdateWithCloudCommerceExport
+from .validation import ValidationReport
+from .woocommerce_export import WoocommerceExport
+
+
+class UpdateStats:
+    """
+    Counts for an update run, filled in as its import rows are consumed.
+
+    export_rows counts the export rows processed after validation. Rows left out by
+    skip_invalid are counted in skipped_rows instead.
+    """
+
+    def __init__(self, header, validation_report=None):
+        """Set the import header and validation report and zero the counts."""
+        self.header = header
+        self.validation_report = validation_report or ValidationReport()
+        self.export_rows = 0
+        self.skipped_rows = 0
+        self.update_rows = 0
+        self.complete = False
+
+    def __repr__(self):
+        return (
+            f"UpdateStats(export_rows={self.export_rows}, "
+            f"skipped_rows={self.skipped_rows}, update_rows={self.update_rows}, complete={self.complete})"
+        )
+
+
+def load_export(source):
+    """
+    Return the rows of a Woocommerce export.
+
+    source may be a WoocommerceExport, a path to an export CSV, an open export CSV
+    file, an iterable of lists of values with the header first or an iterable of
+    mappings of column header to value.
+    """
+    if isinstance(source, WoocommerceExport):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        return WoocommerceExport(source)
+    if hasattr(source, "read"):
+        return WoocommerceExport.from_file(source)
+    rows = iter(source)
+    try:
+        first = next(rows)
+    except StopIteration:
+        return []
+    if isinstance(first, Mapping):
+        return itertools.chain([first], rows)
+    return WoocommerceExport(rows=itertools.chain([first], rows))
+
+
+def run(update_class, source, cc_export_path=None, lookup=None, skip_invalid=False):
+    """
+    Run an update against a Woocommerce export.
+
+    Returns a lazy iterator of import rows and an UpdateStats which is updated as the
+    rows are consumed. The import header is available as stats.header.
+
+    Updates requiring a Cloud Commerce export take either cc_export_path or a lookup
+    created with update_class.create_lookup, which can be shared between runs. A
+    WoocommerceExport passed as source can likewise be shared between updates.
+
+    The exports are validated before any rows are returned. If skip_invalid is True
+    rows which fail validation are left out, otherwise InvalidCloudCommerceExport is
+    raised. Either way the ValidationReport is available as stats.validation_report.
+    """
+    export = load_export(source)
+    args = ()
+    report = None
+    skipped_rows = 0
+    if issubclass(update_class, ProductUpdateWithCloudCommerceExport):
+        if lookup is None:
+            if cc_export_path is None:
+                raise ValueError(
+                    f"{update_class.__name__} requires cc_export_path or lookup."
+                )
+            lookup = update_class.create_lookup(cc_export_path)
+        if not isinstance(export, (WoocommerceExport, list)):
+            export = list(export)
+        valid_rows, report = update_class.get_valid_rows(
+            export, lookup, skip_invalid=skip_invalid
+        )
+        skipped_rows = len(export) - len(valid_rows)
+        export = valid_rows
+        args = (lookup,)
+    stats = UpdateStats(update_class.IMPORT_HEADER, report)
+    stats.skipped_rows = skipped_rows
+    return _iter_import_rows(update_class, export, args, stats), stats
+
+
+def _count_export_rows(export, stats):
+    for export_row in export:
+        stats.export_rows += 1
+        yield export_row
+
+
+def _iter_import_rows(update_class, export, args, stats):
+    export_rows = _count_export_rows(export, stats)
+    for import_row in update_class.iter_import_data(export_rows, *args):
+        stats.update_rows += 1
+        yield import_row
+    stats.complete = True
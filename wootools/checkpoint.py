@@ -0,0 +1,151 @@
+"""
+CheckpointedUpdate runs product updates in chunks which are saved as they complete.
+
+The export is split into numbered chunks of rows. The import rows for each chunk are
+written to the checkpoint folder once the chunk is finished so that an interrupted
+run can be resumed without repeating completed chunks.
+"""
+
+import csv
+import datetime
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import click
+
+from .exceptions import CheckpointMismatch
+from .files import atomic_write
+
+
+class CheckpointedUpdate:
+    """Run a product update in chunks, saving each chunk's import rows to disk."""
+
+    MANIFEST = "manifest.json"
+    CHUNK_GLOB = "chunk_*.csv"
+
+    def __init__(
+        self, update_class, export, checkpoint_dir, chunk_size=1000, args=(), sources=()
+    ):
+        """
+        Set up the update.
+
+        args are passed to update_class.process_export_row after each row. sources are
+        the paths of the files the update reads, used to check that a resumed run
+        matches the checkpoint.
+        """
+        self.update_class = update_class
+        self.export = export
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.chunk_size = chunk_size
+        self.args = args
+        self.sources = sources
+        self.row_count = len(export)
+        self.chunk_count = -(-self.row_count // chunk_size)
+
+    def chunk_path(self, chunk_number):
+        """Return the path of the checkpoint file for a chunk."""
+        return self.checkpoint_dir / f"chunk_{chunk_number:06d}.csv"
+
+    def manifest(self):
+        """Return a description of the run used to validate a resumed checkpoint."""
+        sources = []
+        for path in self.sources:
+            stat = os.stat(path)
+            sources.append([str(path), stat.st_size, stat.st_mtime])
+        return {
+            "update": self.update_class.__name__,
+            "chunk_size": self.chunk_size,
+            "row_count": self.row_count,
+            "sources": sources,
+        }
+
+    def prepare(self, resume=False):
+        """Create the checkpoint folder, clearing it unless resuming."""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.checkpoint_dir / self.MANIFEST
+        manifest = self.manifest()
+        if resume and manifest_path.exists():
+            with open(manifest_path) as f:
+                if json.load(f) != manifest:
+                    raise CheckpointMismatch(self.checkpoint_dir)
+            return
+        for path in self.checkpoint_dir.glob(self.CHUNK_GLOB):
+            path.unlink()
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+    def chunks(self):
+        """Yield lists of export rows of at most chunk_size rows."""
+        rows = iter(self.export)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def run(self, resume=False):
+        """Process every chunk not already saved in the checkpoint folder."""
+        self.prepare(resume=resume)
+        start = time.monotonic()
+        processed_rows = 0
+        completed_rows = 0
+        for chunk_number, chunk in enumerate(self.chunks()):
+            completed_rows += len(chunk)
+            path = self.chunk_path(chunk_number)
+            if path.exists():
+                continue
+            import_data = self.update_class.iter_import_data(chunk, *self.args)
+            self.write_chunk(path, import_data)
+            processed_rows += len(chunk)
+            self.write_progress_message(
+                chunk_number,
+                completed_rows,
+                processed_rows,
+                time.monotonic() - start,
+            )
+
+    @staticmethod
+    def write_chunk(path, import_data):
+        """Write a chunk's import rows, replacing path atomically."""
+        with atomic_write(path) as f:
+            csv.writer(f).writerows(import_data)
+
+    def write_progress_message(
+        self, chunk_number, completed_rows, processed_rows, elapsed
+    ):
+        """Write progress and throughput to stderr."""
+        rate = processed_rows / elapsed if elapsed else 0
+        remaining = self.row_count - completed_rows
+        eta = datetime.timedelta(seconds=round(remaining / rate)) if rate else "-"
+        click.echo(
+            f"Chunk {chunk_number + 1}/{self.chunk_count} complete: "
+            f"{completed_rows}/{self.row_count} rows, {rate:.0f} rows/s, ETA {eta}.",
+            err=True,
+        )
+
+    def iter_import_data(self):
+        """Yield the saved import rows of every chunk in order."""
+        for chunk_number in range(self.chunk_count):
+            with open(self.chunk_path(chunk_number), newline="", encoding="utf-8") as f:
+                yield from csv.reader(f)
+
+    def has_import_data(self):
+        """Return True if any saved chunk contains import rows."""
+        return any(
+            self.chunk_path(chunk_number).stat().st_size
+            for chunk_number in range(self.chunk_count)
+        )
+
+    def write_output(self, output=None):
+        """Write CSV to output, defaulting to stdout. Return the number of rows."""
+        f = csv.writer(output or sys.stdout)
+        f.writerow(self.update_class.IMPORT_HEADER)
+        row_count = 0
+        for row in self.iter_import_data():
+            f.writerow(row)
+            row_count += 1
+        return row_count
@@ -4,13 +4,24 @@ import click
 
 from . import exceptions
 from .add_disclaimers import AddDisclaimers
+from .checkpoint import CheckpointedUpdate
+from .fan_out import find_duplicate_outputs, find_exports, run_sites, write_summary
 from .fix_categories import FixCategories
-from .product_update import create_update_file
+from .product_update import ProductUpdateWithCloudCommerceExport, create_update_file
 from .round_prices import RoundPrices
 from .set_shipping_classes import SetShippingClasses
+from .watch import ExportWatcher
+from .woocommerce_export import WoocommerceExport
 
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
+UPDATES = {
+    "fix-categories": FixCategories,
+    "set-shipping-classes": SetShippingClasses,
+    "add-disclaimers": AddDisclaimers,
+    "round-prices": RoundPrices,
+}
+
 
 @click.group(invoke_without_command=True, context_settings=CONTEXT_SETTINGS)
 @click.pass_context
@@ -63,20 +74,172 @@ def fix_categories(ctx, export_file_path):
     ),
     required=True,
 )
-def set_shipping_classes(ctx, woo_export_path, cc_export_path):
+@click.option(
+    "-c",
+    "--checkpoint_dir",
+    "checkpoint_dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
+    help="Process the export in chunks, saving completed chunks to this folder.",
+)
+@click.option(
+    "--chunk_size",
+    type=click.IntRange(min=1),
+    default=1000,
+    help="Number of export rows in each checkpointed chunk.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skip chunks already completed in the checkpoint folder.",
+)
+@click.option(
+    "--skip_invalid",
+    is_flag=True,
+    help="Skip products with missing Cloud Commerce data instead of stopping.",
+)
+def set_shipping_classes(
+    ctx,
+    woo_export_path,
+    cc_export_path,
+    checkpoint_dir,
+    chunk_size,
+    resume,
+    skip_invalid,
+):
     """
     Set shipping classes for Woocommerce products.
 
     Sets the correct shipping classes for products acording to their "Package Type" and
     "International Shipping" settings in Cloud Commerce.
+
+    Both exports are checked before processing and every product missing from the
+    Cloud Commerce export or missing a "Package Type" or "International Shipping" is
+    reported. With --skip_invalid the remaining products are still processed.
+
+    If a checkpoint folder is given the export is processed in chunks which are saved
+    as they complete, and an interrupted run can be continued with --resume.
     """
+    if resume and checkpoint_dir is None:
+        raise click.UsageError("--resume requires --checkpoint_dir.")
     try:
-        create_update_file(SetShippingClasses, woo_export_path, cc_export_path)
-    except exceptions.ProductNotFoundInCloudCommerceExport as e:
-        click.echo(
-            f"The product with SKU {e.SKU} was not found in the Cloud Commerce Export.",
-            err=True,
+        if checkpoint_dir is None:
+            create_update_file(
+                SetShippingClasses,
+                woo_export_path,
+                cc_export_path,
+                skip_invalid=skip_invalid,
+            )
+        else:
+            lookup = SetShippingClasses.create_lookup(cc_export_path)
+            rows, report = SetShippingClasses.get_valid_rows(
+                WoocommerceExport(woo_export_path), lookup, skip_invalid=skip_invalid
+            )
+            update = CheckpointedUpdate(
+                SetShippingClasses,
+                rows,
+                checkpoint_dir,
+                chunk_size=chunk_size,
+                args=(lookup,),
+                sources=(woo_export_path, cc_export_path),
+            )
+            update.run(resume=resume)
+            report.write_report()
+            if update.has_import_data():
+                row_count = update.write_output()
+                click.echo(f"{row_count} update rows.", err=True)
+            else:
+                click.echo("No data to write.", err=True)
+    except exceptions.InvalidCloudCommerceExport as e:
+        e.report.write_report()
+        click.echo("Use --skip_invalid to process the remaining products.", err=True)
+        ctx.exit(1)
+    except exceptions.CloudCommerceExportError as e:
+        click.echo(str(e), err=True)
+        ctx.exit(1)
+    except exceptions.CheckpointMismatch as e:
+        raise click.UsageError(str(e))
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    "-w",
+    "--woo_export_path",
+    "woo_export_paths",
+    type=click.Path(
+        exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True
+    ),
+    multiple=True,
+    help="A Woocommerce export. May be given more than once.",
+)
+@click.option(
+    "-g",
+    "--glob",
+    "patterns",
+    multiple=True,
+    help="Glob pattern matching Woocommerce exports. May be given more than once.",
+)
+@click.option(
+    "-i",
+    "--cc_export_path",
+    "cc_export_path",
+    type=click.Path(
+        exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True
+    ),
+    required=True,
+)
+@click.option(
+    "-o",
+    "--output_dir",
+    "output_dir",
+    type=click.Path(
+        exists=True, file_okay=False, dir_okay=True, writable=True, resolve_path=True
+    ),
+    required=True,
+    help="Folder to write import files to.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes.",
+)
+@click.option(
+    "--skip_invalid",
+    is_flag=True,
+    help="Skip products with missing Cloud Commerce data instead of stopping.",
+)
+def set_shipping_classes_sites(
+    ctx, woo_export_paths, patterns, cc_export_path, output_dir, workers, skip_invalid
+):
+    """
+    Set shipping classes for several Woocommerce sites.
+
+    Runs set-shipping-classes against the exports of several sites which share one
+    Cloud Commerce catalogue. The Cloud Commerce lookup is built once and the exports
+    are processed concurrently, writing an import file for each to the output folder.
+    Exits with status 1 if any export failed.
+    """
+    export_paths = find_exports(woo_export_paths, patterns)
+    if not export_paths:
+        raise click.UsageError("No Woocommerce exports given.")
+    duplicates = find_duplicate_outputs(export_paths, output_dir)
+    if duplicates:
+        raise click.UsageError(
+            "Exports with the same file name would overwrite each other's import "
+            f"files: {', '.join(str(path) for path in duplicates)}"
         )
+    lookup = SetShippingClasses.create_lookup(cc_export_path)
+    results = run_sites(
+        SetShippingClasses,
+        export_paths,
+        output_dir,
+        update_kwargs={"lookup": lookup, "skip_invalid": skip_invalid},
+        workers=workers,
+    )
+    write_summary(results)
+    if any(result.error is not None for result in results):
+        ctx.exit(1)
 
 
 @cli.command()
@@ -113,3 +276,105 @@ def round_prices(ctx, export_file_path):
     STDOUT that will round all product prices such that the end with .25, .49, .75. .99.
     """
     create_update_file(RoundPrices, export_file_path)
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    "-u",
+    "--update",
+    "update_name",
+    type=click.Choice(sorted(UPDATES)),
+    required=True,
+    help="The update to run on each export.",
+)
+@click.option(
+    "--watch",
+    "watch_dir",
+    type=click.Path(
+        exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True
+    ),
+    required=True,
+    help="Folder to watch for Woocommerce exports.",
+)
+@click.option(
+    "-o",
+    "--output_dir",
+    "output_dir",
+    type=click.Path(
+        exists=True, file_okay=False, dir_okay=True, writable=True, resolve_path=True
+    ),
+    required=True,
+    help="Folder to write import files to.",
+)
+@click.option(
+    "-i",
+    "--cc_export_path",
+    "cc_export_path",
+    type=click.Path(
+        exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True
+    ),
+    help="Cloud Commerce Product Export, required by set-shipping-classes.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes.",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    help="Seconds between polls of the folder.",
+)
+@click.option(
+    "--skip_invalid",
+    is_flag=True,
+    help="Skip products with missing Cloud Commerce data instead of stopping.",
+)
+def serve(
+    ctx,
+    update_name,
+    watch_dir,
+    output_dir,
+    cc_export_path,
+    workers,
+    interval,
+    skip_invalid,
+):
+    """
+    Process Woocommerce exports as they are added to a folder.
+
+    Watches a folder for new export files and writes an import file for each one to
+    the output folder. Any Cloud Commerce lookup is built once at startup and kept in
+    memory between exports.
+
+    Exports are moved to the "processed" subfolder of the watch folder once they
+    have been processed, or to "failed" if the update failed.
+    """
+    if watch_dir == output_dir:
+        raise click.BadParameter(
+            "Must be different to the watch folder.", param_hint="--output_dir"
+        )
+    update_class = UPDATES[update_name]
+    update_kwargs = {}
+    if issubclass(update_class, ProductUpdateWithCloudCommerceExport):
+        if cc_export_path is None:
+            raise click.BadParameter(
+                f"Required by {update_name}.", param_hint="--cc_export_path"
+            )
+        update_kwargs["lookup"] = update_class.create_lookup(cc_export_path)
+        update_kwargs["skip_invalid"] = skip_invalid
+    watcher = ExportWatcher(
+        update_class,
+        watch_dir,
+        output_dir,
+        update_kwargs=update_kwargs,
+        workers=workers,
+    )
+    click.echo(f"Watching {watch_dir} for exports.", err=True)
+    try:
+        watcher.run(interval=interval)
+    except KeyboardInterrupt:
+        click.echo("Stopped.", err=True)
@@ -1,7 +1,11 @@
 """Wootools exceptions."""
 
 
-class ProductNotFoundInCloudCommerceExport(Exception):
+class CloudCommerceExportError(Exception):
+    """Base exception for Woocommerce products with invalid Cloud Commerce data."""
+
+
+class ProductNotFoundInCloudCommerceExport(CloudCommerceExportError):
     """Exception for failure to find a Woocommerce product in a Cloud Commerce export."""
 
     def __init__(self, SKU):
@@ -10,3 +14,57 @@ class ProductNotFoundInCloudCommerceExport(Exception):
         super().__init__(
             f"The product with SKU {SKU} was not found in the Cloud Commerce Export."
         )
+
+    def __reduce__(self):
+        return (type(self), (self.SKU,))
+
+
+class PackageTypeNotSet(CloudCommerceExportError):
+    """Exception for a Cloud Commerce product without a Package Type."""
+
+    def __init__(self, SKU):
+        """Raise exception."""
+        self.SKU = SKU
+        super().__init__(f'No Package type set for "{SKU}"')
+
+    def __reduce__(self):
+        return (type(self), (self.SKU,))
+
+
+class InternationalShippingNotSet(CloudCommerceExportError):
+    """Exception for a Cloud Commerce product without an International Shipping."""
+
+    def __init__(self, SKU):
+        """Raise exception."""
+        self.SKU = SKU
+        super().__init__(f'No International Shipping set for "{SKU}"')
+
+    def __reduce__(self):
+        return (type(self), (self.SKU,))
+
+
+class InvalidCloudCommerceExport(CloudCommerceExportError):
+    """Exception for a Cloud Commerce export which failed validation."""
+
+    def __init__(self, report):
+        """Raise exception."""
+        self.report = report
+        super().__init__("\n".join(report.lines()))
+
+    def __reduce__(self):
+        return (type(self), (self.report,))
+
+
+class CheckpointMismatch(Exception):
+    """Exception for resuming from a checkpoint created by a different run."""
+
+    def __init__(self, checkpoint_dir):
+        """Raise exception."""
+        self.checkpoint_dir = checkpoint_dir
+        super().__init__(
+            f"The checkpoint in {checkpoint_dir} was created for a different update, "
+            "export or chunk size."
+        )
+
+    def __reduce__(self):
+        return (type(self), (self.checkpoint_dir,))
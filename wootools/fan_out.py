@@ -0,0 +1,52 @@
+"""Run one update against the Woocommerce exports of several sites concurrently."""
+
+import glob
+import os
+from pathlib import Path
+
+import click
+
+from .workers import create_pool, get_output_path, process_export_files
+
+
+def find_exports(export_paths=(), patterns=()):
+    """Return the unique export paths given and matching the glob patterns."""
+    paths = [Path(path).resolve() for path in export_paths]
+    for pattern in patterns:
+        paths.extend(Path(path).resolve() for path in sorted(glob.glob(pattern)))
+    return list(dict.fromkeys(paths))
+
+
+def find_duplicate_outputs(export_paths, output_dir):
+    """Return export paths which would write to the same import file as another."""
+    outputs = {}
+    for path in export_paths:
+        outputs.setdefault(get_output_path(path, output_dir), []).append(path)
+    return [path for paths in outputs.values() if len(paths) > 1 for path in paths]
+
+
+def run_sites(update_class, export_paths, output_dir, update_kwargs=None, workers=None):
+    """
+    Run an update against each export concurrently.
+
+    update_kwargs, such as a Cloud Commerce lookup, are passed once to each worker
+    process and shared by every export it handles. Returns a list of ExportResult in
+    the order of export_paths.
+    """
+    if workers is None:
+        workers = min(len(export_paths), os.cpu_count() or 1)
+    with create_pool(update_class, update_kwargs, workers) as pool:
+        return list(process_export_files(pool, export_paths, output_dir))
+
+
+def write_summary(results):
+    """Write each site's result and the combined totals to stderr."""
+    for result in results:
+        result.write_message()
+    failed = [result for result in results if result.error is not None]
+    row_count = sum(result.row_count for result in results)
+    click.echo(
+        f"{len(results)} exports processed: {row_count} update rows, "
+        f"{len(failed)} failed.",
+        err=True,
+    )
@@ -0,0 +1,27 @@
+"""Helpers for writing output files."""
+
+import contextlib
+import os
+from pathlib import Path
+
+
+@contextlib.contextmanager
+def atomic_write(path):
+    """
+    Open a CSV file for writing which replaces path only once it is complete.
+
+    The file is written to a temporary file in the same folder which is renamed over
+    path when the block exits without error and deleted otherwise.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(temp_path, "w", newline="", encoding="utf-8") as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
@@ -6,6 +6,8 @@ import sys
 import click
 from tabler import Table
 
+from .exceptions import InvalidCloudCommerceExport
+from .validation import ValidationReport
 from .woocommerce_export import WoocommerceExport
 
 
@@ -26,32 +28,39 @@ class ProductUpdate:
     def __init__(self, export_file_path):
         """Write a CSV file to make the necessary changes to stdout."""
         self.export = WoocommerceExport(export_file_path)
+        self.validation_report = ValidationReport()
         self.import_data = self.create_import_data(self.export)
 
-    def process_export_row(self, row):
+    @classmethod
+    def process_export_row(cls, row):
         """Return an updated CSV row if updates are necessary, otherwise return None."""
         raise NotImplementedError
 
-    def create_import_data(self, export, *args, **kwargs):
-        """Return CSV rows as a list of lists of values."""
-        import_data = []
+    @classmethod
+    def iter_import_data(cls, export, *args, **kwargs):
+        """Yield CSV rows as lists of values for rows of export requiring updates."""
         for export_row in export:
-            import_row = self.process_export_row(export_row, *args, **kwargs)
+            import_row = cls.process_export_row(export_row, *args, **kwargs)
             if import_row is not None:
-                import_data.append(import_row)
-        return import_data
+                yield import_row
+
+    def create_import_data(self, export, *args, **kwargs):
+        """Return CSV rows as a list of lists of values."""
+        return list(self.iter_import_data(export, *args, **kwargs))
 
     def write_success_message(self):
-        """Write status message to sdterr."""
+        """Write any validation problems and status message to sdterr."""
+        self.validation_report.write_report()
         click.echo(f"{len(self.import_data)} update rows.", err=True)
 
     def write_empty_message(self):
-        """Write messsage for an empty output to stderr."""
+        """Write any validation problems and messsage for an empty output to stderr."""
+        self.validation_report.write_report()
         click.echo("No data to write.", err=True)
 
-    def write_output(self):
-        """Write CSV to stdout."""
-        f = csv.writer(sys.stdout)
+    def write_output(self, output=None):
+        """Write CSV to output, defaulting to stdout."""
+        f = csv.writer(output or sys.stdout)
         f.writerow(self.IMPORT_HEADER)
         f.writerows(self.import_data)
 
@@ -64,16 +73,58 @@ class ProductUpdateWithCloudCommerceExport(ProductUpdate):
     CC_PACKAGE_TYPE_COLUMN = "OPT_Package Type"
     CC_INTERNATIONAL_SHIPPING_COLUMN = "OPT_International Shipping"
 
-    def __init__(self, woo_export_path, cc_export_path):
-        """Get a lookup table for Cloud Commerce Product Export rows."""
-        self.inventory = Table(cc_export_path)
-        self.CC_ROWS = {}
-        for row in self.inventory:
-            self.CC_ROWS[row["VAR_SKU"]] = row
-            self.CC_ROWS[row["RNG_SKU"]] = row
+    def __init__(
+        self, woo_export_path, cc_export_path=None, lookup=None, skip_invalid=False
+    ):
+        """
+        Get a lookup table for Cloud Commerce Product Export rows.
+
+        If lookup is passed it is used in place of reading cc_export_path, allowing a
+        lookup created with create_lookup to be shared between updates.
+
+        The exports are validated before any rows are processed. If skip_invalid is
+        True rows which fail validation are left out, otherwise
+        InvalidCloudCommerceExport is raised.
+        """
+        if lookup is None:
+            lookup = self.create_lookup(cc_export_path)
+        self.CC_ROWS = lookup
         self.export = WoocommerceExport(woo_export_path)
-        self.import_data = self.create_import_data(self.export, self.CC_ROWS)
-
-    def process_export_row(self, row, lookup):
+        rows, self.validation_report = self.get_valid_rows(
+            self.export, self.CC_ROWS, skip_invalid=skip_invalid
+        )
+        self.import_data = self.create_import_data(rows, self.CC_ROWS)
+
+    @classmethod
+    def create_lookup(cls, cc_export_path):
+        """Return a lookup table of Cloud Commerce Product Export rows by SKU."""
+        lookup = {}
+        for row in Table(cc_export_path):
+            lookup[row[cls.CC_SKU_COLUMN]] = row
+            lookup[row[cls.CC_RANGE_SKU_COLUMN]] = row
+        return lookup
+
+    @classmethod
+    def validate_exports(cls, export, lookup):
+        """Return a ValidationReport for the Woocommerce export and lookup."""
+        return ValidationReport()
+
+    @classmethod
+    def get_valid_rows(cls, export, lookup, skip_invalid=False):
+        """
+        Return the rows of export which can be processed and a ValidationReport.
+
+        Raise InvalidCloudCommerceExport if any rows are invalid, unless skip_invalid
+        is True.
+        """
+        report = cls.validate_exports(export, lookup)
+        if report.is_valid:
+            return export, report
+        if not skip_invalid:
+            raise InvalidCloudCommerceExport(report)
+        return report.filter_rows(export), report
+
+    @classmethod
+    def process_export_row(cls, row, lookup):
         """Return an updated CSV row if updates are necessary, otherwise return None."""
         raise NotImplementedError
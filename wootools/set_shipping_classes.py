@@ -1,7 +1,12 @@
 """Set product shipping classes."""
 
-from .exceptions import ProductNotFoundInCloudCommerceExport
+from .exceptions import (
+    InternationalShippingNotSet,
+    PackageTypeNotSet,
+    ProductNotFoundInCloudCommerceExport,
+)
 from .product_update import ProductUpdateWithCloudCommerceExport
+from .validation import ValidationReport
 from .woocommerce_export import WoocommerceExport
 
 
@@ -92,7 +97,7 @@ class SetShippingClasses(ProductUpdateWithCloudCommerceExport):
         SKU = row[cls.CC_SKU_COLUMN]
         package_type = row[cls.CC_PACKAGE_TYPE_COLUMN]
         if not package_type:
-            raise Exception(f'No Package type set for "{SKU}"')
+            raise PackageTypeNotSet(SKU)
         return package_type
 
     @classmethod
@@ -101,18 +106,50 @@ class SetShippingClasses(ProductUpdateWithCloudCommerceExport):
         SKU = row[cls.CC_SKU_COLUMN]
         international_shipping = row[cls.CC_INTERNATIONAL_SHIPPING_COLUMN]
         if not international_shipping:
-            raise Exception(f'No International Shipping set for "{SKU}"')
+            raise InternationalShippingNotSet(SKU)
         return international_shipping
 
+    @staticmethod
+    def get_lookup_SKU(SKU):
+        """Return the Cloud Commerce SKU for a Woocommerce SKU."""
+        if "RNG" in SKU:
+            return "_".join(SKU.split("_")[:2])
+        return SKU.split("_")[0]
+
     @classmethod
     def get_package_types(cls, SKU, lookup):
         """Return the pacage types for a product."""
+        SKU = cls.get_lookup_SKU(SKU)
         try:
-            if "RNG" in SKU:
-                SKU = "_".join(SKU.split("_")[:2])
-            else:
-                SKU = SKU.split("_")[0]
             cc_row = lookup[SKU]
         except KeyError:
             raise ProductNotFoundInCloudCommerceExport(SKU)
         return (cls.get_package_type(cc_row), cls.get_international_shipping(cc_row))
+
+    @classmethod
+    def validate_exports(cls, export, lookup):
+        """
+        Return a ValidationReport for the Woocommerce export and lookup.
+
+        Every Woocommerce SKU is checked in one pass, reporting each missing product,
+        Package Type and International Shipping rather than stopping at the first.
+        """
+        report = ValidationReport()
+        woo_SKUs = {}
+        for row in export:
+            SKU = row[WoocommerceExport.SKU]
+            if SKU:
+                woo_SKUs.setdefault(cls.get_lookup_SKU(SKU), set()).add(SKU)
+        for lookup_SKU in woo_SKUs.keys() - lookup.keys():
+            report.missing_skus.add(lookup_SKU)
+            report.invalid_skus.update(woo_SKUs[lookup_SKU])
+        for lookup_SKU in woo_SKUs.keys() & lookup.keys():
+            cc_row = lookup[lookup_SKU]
+            cc_SKU = cc_row[cls.CC_SKU_COLUMN]
+            if not cc_row[cls.CC_PACKAGE_TYPE_COLUMN]:
+                report.missing_package_types.add(cc_SKU)
+                report.invalid_skus.update(woo_SKUs[lookup_SKU])
+            if not cc_row[cls.CC_INTERNATIONAL_SHIPPING_COLUMN]:
+                report.missing_international_shipping.add(cc_SKU)
+                report.invalid_skus.update(woo_SKUs[lookup_SKU])
+        return report
@@ -0,0 +1,52 @@
+"""ValidationReport collects every problem found checking exports before an update."""
+
+import click
+
+from .woocommerce_export import WoocommerceExport
+
+
+class ValidationReport:
+    """
+    ValidationReport collects every problem found checking exports before an update.
+
+    invalid_skus holds the Woocommerce SKUs of export rows which cannot be processed.
+    """
+
+    def __init__(self):
+        """Create an empty report."""
+        self.missing_skus = set()
+        self.missing_package_types = set()
+        self.missing_international_shipping = set()
+        self.invalid_skus = set()
+
+    @property
+    def is_valid(self):
+        """Return True if no problems were found."""
+        return not self.invalid_skus
+
+    def lines(self):
+        """Return the report as a list of lines."""
+        lines = []
+        for message, skus in (
+            ("not found in the Cloud Commerce Export", self.missing_skus),
+            ("with no Package Type set", self.missing_package_types),
+            ("with no International Shipping set", self.missing_international_shipping),
+        ):
+            if skus:
+                lines.append(
+                    f"{len(skus)} products {message}: {', '.join(sorted(skus))}"
+                )
+        if lines:
+            lines.append(f"{len(self.invalid_skus)} Woocommerce products affected.")
+        return lines
+
+    def filter_rows(self, export):
+        """Return the rows of export which can be processed."""
+        return [
+            row for row in export if row[WoocommerceExport.SKU] not in self.invalid_skus
+        ]
+
+    def write_report(self):
+        """Write the report to stderr."""
+        for line in self.lines():
+            click.echo(line, err=True)
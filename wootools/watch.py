@@ -0,0 +1,123 @@
+"""ExportWatcher processes Woocommerce exports as they are added to a folder."""
+
+import time
+from pathlib import Path
+
+from . import workers
+
+
+class ExportWatcher:
+    """
+    ExportWatcher processes Woocommerce exports as they are added to a folder.
+
+    The watch folder is polled for export files. Once a file has stopped changing
+    between polls it is passed to a pool of worker processes which run the update and
+    write an import file to the output folder. The worker pool, and any Cloud Commerce
+    lookup passed in update_kwargs, is kept for the lifetime of the watcher.
+
+    Processed exports are moved to the processed subfolder of the watch folder, or
+    the failed subfolder if the update failed, so they are not processed again after
+    a restart.
+    """
+
+    PATTERN = "*.csv"
+    PROCESSED_DIR = "processed"
+    FAILED_DIR = "failed"
+
+    def __init__(
+        self, update_class, watch_dir, output_dir, update_kwargs=None, workers=None
+    ):
+        """Set up the watcher without starting the worker pool."""
+        self.update_class = update_class
+        self.watch_dir = Path(watch_dir)
+        self.output_dir = Path(output_dir)
+        self.update_kwargs = update_kwargs or {}
+        self.workers = workers
+        self.pool = None
+        self._pending = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """Start the worker pool."""
+        if self.pool is None:
+            self.pool = workers.create_pool(
+                self.update_class, self.update_kwargs, self.workers
+            )
+
+    def stop(self):
+        """Shut down the worker pool."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def poll(self):
+        """Return export files which are ready to be processed."""
+        ready = []
+        current = {}
+        for path in sorted(self.watch_dir.glob(self.PATTERN)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            if self._pending.get(path) == signature:
+                ready.append(path)
+            else:
+                current[path] = signature
+        self._pending = current
+        return ready
+
+    def process(self, paths):
+        """
+        Process export files using the worker pool.
+
+        If a worker process stops unexpectedly the pool is replaced and the exports
+        it did not finish are retried one at a time, so that only the export which
+        caused the failure is moved to the failed folder.
+        """
+        self.start()
+        pool_broken = False
+        retry = []
+        for result in workers.process_export_files(self.pool, paths, self.output_dir):
+            pool_broken = pool_broken or result.pool_broken
+            if result.pool_broken and len(paths) > 1:
+                retry.append(result.export_path)
+                continue
+            result.write_message()
+            if result.error is None:
+                self.move_export(result.export_path, self.PROCESSED_DIR)
+            else:
+                self.move_export(result.export_path, self.FAILED_DIR)
+        if pool_broken:
+            self.stop()
+        for path in retry:
+            self.process([path])
+
+    def move_export(self, path, folder):
+        """Move a processed export to a subfolder of the watch folder."""
+        destination = self.watch_dir / folder
+        destination.mkdir(exist_ok=True)
+        try:
+            path.replace(destination / path.name)
+        except FileNotFoundError:
+            pass
+
+    def run_once(self):
+        """Poll the watch folder and process any exports which are ready."""
+        paths = self.poll()
+        if paths:
+            self.process(paths)
+        return paths
+
+    def run(self, interval=1.0):
+        """Process exports as they are added to the watch folder until interrupted."""
+        with self:
+            while True:
+                self.run_once()
+                time.sleep(interval)
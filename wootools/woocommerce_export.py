@@ -21,18 +21,34 @@ class WoocommerceExport:
     PRICE = "Regular price"
     DESCRIPTION = "Description"
 
-    def __init__(self, file_path):
-        """Read an export CSV and create the header and rows."""
-        with open(file_path, "r", encoding="utf-8-sig") as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-
-        self.header = rows[0]
+    def __init__(self, file_path=None, rows=None):
+        """
+        Read an export CSV and create the header and rows.
+
+        If rows is passed it is used in place of reading file_path. The first row
+        must be the header. An empty file or rows gives an export with no header or
+        rows.
+        """
+        if rows is None:
+            with open(file_path, "r", encoding="utf-8-sig") as f:
+                rows = list(csv.reader(f))
+        else:
+            rows = list(rows)
+
+        self.header = rows[0] if rows else []
         self.rows = [_WoocommerceExportRow(row, self) for row in rows[1:]]
 
+    @classmethod
+    def from_file(cls, f):
+        """Return a WoocommerceExport read from an open export CSV file."""
+        return cls(rows=csv.reader(f))
+
     def __getitem__(self, index):
         return self.rows[index]
 
+    def __len__(self):
+        return len(self.rows)
+
     def __iter__(self):
         for _ in self.rows:
             yield _
@@ -0,0 +1,134 @@
+"""
+Worker pool for running product updates against many export files.
+
+Each worker process is initialised once with the update class and any arguments it
+needs, such as a prebuilt Cloud Commerce lookup, so that only the transform of each
+export file is repeated.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import click
+
+from .exceptions import CloudCommerceExportError
+from .files import atomic_write
+
+_update_class = None
+_update_kwargs = {}
+
+
+class ExportResult:
+    """
+    The outcome of running an update against one export file.
+
+    pool_broken is True if the export was not processed because a worker process
+    stopped unexpectedly, in which case the pool can not be used again.
+    """
+
+    def __init__(
+        self,
+        export_path,
+        output_path=None,
+        row_count=0,
+        messages=(),
+        error=None,
+        pool_broken=False,
+    ):
+        """Store the result."""
+        self.export_path = Path(export_path)
+        self.output_path = output_path
+        self.row_count = row_count
+        self.messages = list(messages)
+        self.error = error
+        self.pool_broken = pool_broken
+
+    def write_message(self):
+        """Write the result to stderr."""
+        name = self.export_path.name
+        for message in self.messages:
+            click.echo(f"{name}: {message}", err=True)
+        if self.error is not None:
+            for line in self.error.splitlines():
+                click.echo(f"{name}: {line}", err=True)
+        elif self.output_path is None:
+            click.echo(f"{name}: No data to write.", err=True)
+        else:
+            click.echo(
+                f"{name}: {self.row_count} update rows written to "
+                f"{self.output_path.name}.",
+                err=True,
+            )
+
+
+def _init_worker(update_class, update_kwargs):
+    """Store the update to run in this worker process."""
+    global _update_class, _update_kwargs
+    _update_class = update_class
+    _update_kwargs = update_kwargs
+
+
+def create_pool(update_class, update_kwargs=None, workers=None):
+    """Return a process pool whose workers run update_class."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(update_class, update_kwargs or {}),
+    )
+
+
+def get_output_path(export_path, output_dir):
+    """Return the path of the import file for an export file."""
+    export_path = Path(export_path)
+    return Path(output_dir) / f"{export_path.stem}_import.csv"
+
+
+def write_update_file(update, output_path):
+    """Write the import file for an update, replacing output_path atomically."""
+    with atomic_write(output_path) as f:
+        update.write_output(f)
+
+
+def process_export_file(export_path, output_dir):
+    """
+    Run the worker's update against an export file.
+
+    Writes the import file to output_dir if any updates are necessary. Returns the
+    path of the import file, or None if there was nothing to write, the number of
+    update rows and any validation problems.
+    """
+    update = _update_class(export_path, **_update_kwargs)
+    messages = update.validation_report.lines()
+    if not update.import_data:
+        return None, 0, messages
+    output_path = get_output_path(export_path, output_dir)
+    write_update_file(update, output_path)
+    return output_path, len(update.import_data), messages
+
+
+def process_export_files(pool, export_paths, output_dir):
+    """Yield an ExportResult for each export file, processed concurrently by pool."""
+    futures = []
+    for path in export_paths:
+        try:
+            future = pool.submit(process_export_file, str(path), str(output_dir))
+        except BrokenProcessPool as e:
+            future = Future()
+            future.set_exception(e)
+        futures.append((path, future))
+    for path, future in futures:
+        try:
+            output_path, row_count, messages = future.result()
+        except BrokenProcessPool:
+            yield ExportResult(
+                path,
+                error="Failed because a worker process stopped unexpectedly.",
+                pool_broken=True,
+            )
+        except CloudCommerceExportError as e:
+            yield ExportResult(path, error=str(e))
+        except Exception as e:
+            yield ExportResult(path, error=f"Failed with error: {e!r}")
+        else:
+            yield ExportResult(path, output_path, row_count, messages)